@@ -1,44 +1,351 @@
 import streamlit as st
 from datetime import datetime, timedelta
 import time
+import atexit
+import functools
+import heapq
 import json
+import logging
 import os
+import queue
+import threading
 import pandas as pd
 from collections import defaultdict
 import plotly.express as px
 import plotly.graph_objects as go
-import pytz
+import streamlit.components.v1 as components
+from zoneinfo import ZoneInfo
+import msgpack
 
-# File for saving productive time
-DATA_FILE = "productive_time.json"
+from styles import CSS_THEMES
+
+# Files for saving productive time: small MessagePack state blob + append-only session log
+STATE_FILE = "productive_time.msgpack"
+SESSIONS_FILE = "sessions.msgpack"
+
+# JSON files written by earlier versions, converted once on startup. The original
+# version kept state and the session list together in LEGACY_DATA_FILE.
+LEGACY_DATA_FILE = "productive_time.json"
+LEGACY_STATE_FILE = "state.json"
+LEGACY_SESSIONS_FILE = "sessions.jsonl"
+
+# Longest a rerun waits for this session's queued writes before rendering anyway
+WRITE_WAIT_SECONDS = 5
+
+# Sessions are held in memory column-wise (one list per field)
+SESSION_FIELDS = ["date", "start_time", "formatted_time", "duration", "category", "note", "pomodoro"]
 
 # Set page layout
 st.set_page_config(page_title="⏳ Enhanced Time Tracker", layout="wide")
 
 # India timezone
-INDIA_TZ = pytz.timezone('Asia/Kolkata')
+INDIA_TZ = ZoneInfo('Asia/Kolkata')
+
+
+# Space toggles the timer. Buttons are found through the st-key-<key> class Streamlit puts
+# on keyed widgets, and cached until a rerun replaces them
+KEYBOARD_SHORTCUT_JS = """
+<script>
+const doc = window.parent.document;
+const running = __RUNNING__;
+const buttons = {};
+
+function getButton(key) {
+    if (!buttons[key] || !buttons[key].isConnected) {
+        buttons[key] = doc.querySelector('.st-key-' + key + ' button');
+    }
+    return buttons[key];
+}
+
+if (window.parent.timerKeyHandler) {
+    doc.removeEventListener('keydown', window.parent.timerKeyHandler);
+}
+window.parent.timerKeyHandler = function(e) {
+    if (e.code === 'Space' && !e.target.matches('input, textarea')) {
+        e.preventDefault();
+        const button = getButton(running ? 'btn_stop' : 'btn_start');
+        if (button) {
+            button.click();
+        }
+    }
+};
+doc.addEventListener('keydown', window.parent.timerKeyHandler);
+</script>
+"""
 
 
 # -----------------------
 # Load or Init Data
 # -----------------------
-def load_data():
-    if os.path.exists(DATA_FILE):
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    else:
-        return {
+def _loads(raw):
+    return msgpack.unpackb(raw, raw=False)
+
+
+def _dumps(obj):
+    return msgpack.packb(obj, use_bin_type=True)
+
+
+def _read_legacy_sessions(path):
+    """Sessions from a JSON-lines log; unreadable lines (e.g. a torn final append) are skipped"""
+    sessions = []
+    with open(path, "rb") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                sessions.append(json.loads(line))
+            except ValueError:
+                logging.warning("Skipping unreadable session on line %d of %s", number, path)
+    return sessions
+
+
+def _create_atomic(path, payload):
+    """Create a complete file in one step, or do nothing if the path already exists"""
+    tmp_path = path + ".migrate.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    try:
+        os.link(tmp_path, path)
+    except FileExistsError:
+        pass
+    finally:
+        os.remove(tmp_path)
+
+
+def _read_legacy_json(path):
+    """Parsed JSON file, or None when it is missing or unreadable"""
+    try:
+        with open(path, "rb") as f:
+            return json.loads(f.read())
+    except FileNotFoundError:
+        return None
+    except ValueError:
+        logging.warning("Skipping unreadable legacy data file %s", path)
+        return None
+
+
+@st.cache_resource
+def migrate_legacy_files():
+    """Convert JSON data files from earlier versions to MessagePack, once per process"""
+    # The JSON files are left in place and ignored once the converted files exist.
+    # The exists checks only skip needless reads; _create_atomic never overwrites a file.
+    state_missing = not os.path.exists(STATE_FILE)
+    sessions_missing = not os.path.exists(SESSIONS_FILE)
+    if not (state_missing or sessions_missing):
+        return
+
+    # productive_time.json only survives on installs upgraded straight from the
+    # original version, where it holds the real history, so it takes precedence
+    legacy_data = _read_legacy_json(LEGACY_DATA_FILE)
+
+    if state_missing:
+        if legacy_data is not None:
+            state = {key: value for key, value in legacy_data.items() if key != "sessions"}
+        else:
+            state = _read_legacy_json(LEGACY_STATE_FILE)
+        if state is not None:
+            _create_atomic(STATE_FILE, _dumps(state))
+
+    if sessions_missing:
+        sessions = None
+        if legacy_data is not None:
+            sessions = list(legacy_data.get("sessions", []))
+        try:
+            sessions = (sessions or []) + _read_legacy_sessions(LEGACY_SESSIONS_FILE)
+        except FileNotFoundError:
+            pass
+        if sessions is not None:
+            _create_atomic(SESSIONS_FILE, b"".join(_dumps(session) for session in sessions))
+
+
+def _file_version(path):
+    """Cheap cache key that changes whenever the file is rewritten or appended to"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def add_session_row(sessions, session):
+    for field in SESSION_FIELDS:
+        sessions[field].append(session.get(field))
+
+
+def get_recent_sessions(sessions, count=10):
+    """Last `count` sessions as row dicts, oldest first"""
+    total = len(sessions["date"])
+    return [{field: sessions[field][i] for field in SESSION_FIELDS}
+            for i in range(max(0, total - count), total)]
+
+
+# Only the current file versions are ever requested again, so keep a single entry
+@st.cache_data(show_spinner=False, max_entries=1)
+def _load_cached(state_version, sessions_version):
+    """Parse the data files; only re-runs when one of the file versions changes"""
+    try:
+        with open(STATE_FILE, "rb") as f:
+            data = _loads(f.read())
+    except FileNotFoundError:
+        data = {
             "daily_time": {},
-            "sessions": [],
+            "category_totals": {},
             "goals": {"daily": 8 * 3600, "weekly": 40 * 3600},  # in seconds
             "categories": ["Work", "Study", "Personal", "Exercise"],
             "settings": {"theme": "dark", "pomodoro": {"work": 25, "break": 5}}
         }
 
+    # Sessions live in an append-only log of back-to-back MessagePack objects. A torn
+    # append misframes everything after it, so keep what was read up to that point.
+    data["sessions"] = {field: [] for field in SESSION_FIELDS}
+    try:
+        with open(SESSIONS_FILE, "rb") as f:
+            for session in msgpack.Unpacker(f, raw=False):
+                if not isinstance(session, dict):
+                    raise ValueError(f"unexpected {type(session).__name__} record")
+                add_session_row(data["sessions"], session)
+    except FileNotFoundError:
+        pass
+    except (ValueError, msgpack.exceptions.UnpackException) as exc:
+        logging.warning("Session log %s is damaged after %d sessions, ignoring the rest: %s",
+                        SESSIONS_FILE, len(data["sessions"]["date"]), exc)
+
+    # Running per-category totals, backfilled once for state saved before they existed
+    if "category_totals" not in data:
+        category_time = defaultdict(int)
+        for category, duration in zip(data["sessions"]["category"], data["sessions"]["duration"]):
+            category_time[category] += int(duration)
+        data["category_totals"] = dict(category_time)
+    return data
+
+
+def _write_atomic(path, payload):
+    """Replace a file in one step so readers never see it half-written"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+def _write_pending(items):
+    """Apply queued writes and return {path: error message} for files that failed"""
+    # Appends keep their order; overwrites keep only the newest payload per file
+    appends = {}
+    overwrites = {}
+    for path, payload, append, _ in items:
+        if append:
+            appends[path] = appends.get(path, b"") + payload
+        else:
+            overwrites[path] = payload
+
+    errors = {}
+    for path, payload in appends.items():
+        try:
+            with open(path, "ab") as f:
+                f.write(payload)
+        except OSError as exc:
+            logging.exception("Failed to append to %s", path)
+            errors[path] = str(exc)
+    for path, payload in overwrites.items():
+        try:
+            _write_atomic(path, payload)
+        except OSError as exc:
+            logging.exception("Failed to write %s", path)
+            errors[path] = str(exc)
+    return errors
+
+
+@st.cache_resource
+def get_write_queue():
+    """Queue drained by a single background writer thread, shared by every session"""
+    write_queue = queue.Queue()
+
+    def writer():
+        while True:
+            items = [write_queue.get()]
+            # Coalesce whatever piled up meanwhile into a single pass
+            while True:
+                try:
+                    items.append(write_queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                errors = _write_pending(items)
+            except Exception as exc:  # keep the writer alive; the error is reported to the session
+                logging.exception("Failed to persist time tracker data")
+                errors = {path: str(exc) for path, *_ in items}
+            finally:
+                for path, _, _, status in items:
+                    status["error"] = errors.get(path)
+                    status["done"].set()
+                    write_queue.task_done()
+
+    threading.Thread(target=writer, name="time-tracker-writer", daemon=True).start()
+    # Don't lose queued writes when the server shuts down
+    atexit.register(write_queue.join)
+    return write_queue
+
+
+def queue_write(path, payload, append):
+    """Hand a write to the background writer and remember it for this browser session"""
+    status = {"done": threading.Event(), "error": None}
+    get_write_queue().put((path, payload, append, status))
+    st.session_state.setdefault("pending_writes", []).append(status)
+
+
+def wait_for_own_writes():
+    """Wait (bounded) for this session's queued writes and report any that failed"""
+    deadline = time.monotonic() + WRITE_WAIT_SECONDS
+    errors = set()
+    timed_out = False
+    for status in st.session_state.pop("pending_writes", []):
+        if not status["done"].wait(timeout=max(0.0, deadline - time.monotonic())):
+            timed_out = True
+        elif status["error"]:
+            errors.add(status["error"])
+
+    for error in errors:
+        st.error(f"Could not save your last change: {error}")
+    if timed_out:
+        st.warning("Your last change is still being saved and may not be shown yet.")
 
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+
+def load_data():
+    """st.cache_data hands back a copy, so callers are free to mutate the result"""
+    migrate_legacy_files()
+    # Wait only for this session's own queued writes, so a rerun sees its changes
+    # without blocking on what other sessions are writing
+    wait_for_own_writes()
+    return _load_cached(_file_version(STATE_FILE), _file_version(SESSIONS_FILE))
+
+
+def save_state(data):
+    """Persist everything except the session log"""
+    state = {key: value for key, value in data.items() if key != "sessions"}
+    queue_write(STATE_FILE, _dumps(state), append=False)
+
+
+def mark_dirty():
+    """Defer the state write to the end of the run, so several changes cost a single save"""
+    st.session_state.dirty = True
+
+
+def request_rerun():
+    """Ask for a full app rerun once the current run has written its changes"""
+    st.session_state.rerun_requested = True
+
+
+def finish_run(data):
+    """Write deferred state changes once, then rerun the app if a handler asked for it"""
+    if st.session_state.pop("dirty", False):
+        save_state(data)
+    if st.session_state.pop("rerun_requested", False):
+        st.rerun()
+
+
+def append_session(session):
+    """Append a single session to the log without rewriting history"""
+    queue_write(SESSIONS_FILE, _dumps(session), append=True)
 
 
 def get_india_now():
@@ -49,154 +356,170 @@ def get_india_now():
 data = load_data()
 today_str = get_india_now().strftime("%Y-%m-%d")
 if today_str not in data["daily_time"]:
-    data["daily_time"][today_str] = 0.0
+    data["daily_time"][today_str] = 0
 
 # -----------------------
 # CSS Styling
 # -----------------------
-theme = data["settings"]["theme"]
-if theme == "dark":
-    bg_color = "#0F0F0F"
-    text_color = "#F5DEB3"
-    accent_color = "#FFD700"
-    button_color = "#FFD700"
-else:
-    bg_color = "#FFFFFF"
-    text_color = "#333333"
-    accent_color = "#2E86AB"
-    button_color = "#2E86AB"
-
-st.markdown(f"""
-    <style>
-    html, body, [class*="css"] {{
-        background-color: {bg_color};
-        color: {text_color};
-        font-family: 'Courier New', monospace;
-    }}
-    .big-timer {{
-        font-size: 50px !important;
-        font-weight: bold;
-        color: {accent_color};
-        text-align: center;
-    }}
-    .label {{
-        font-size: 22px !important;
-        color: {accent_color};
-        text-align: center;
-        padding-top: 10px;
-        padding-bottom: 4px;
-    }}
-    .section {{
-        padding: 20px 0;
-    }}
-    .stButton>button {{
-        border-radius: 10px;
-        padding: 0.75em 1.5em;
-        font-size: 16px;
-        font-weight: bold;
-        color: {bg_color};
-        background-color: {button_color};
-        border: none;
-        transition: all 0.3s ease-in-out;
-    }}
-    .stButton>button:hover {{
-        background-color: {accent_color};
-        transform: scale(1.05);
-    }}
-    .streak-box {{
-        background-color: {accent_color};
-        color: {bg_color};
-        padding: 10px;
-        border-radius: 10px;
-        text-align: center;
-        font-weight: bold;
-        margin: 10px 0;
-    }}
-    .timezone-info {{
-        text-align: center;
-        font-size: 14px;
-        color: {accent_color};
-        margin-bottom: 20px;
-    }}
-    </style>
-""", unsafe_allow_html=True)
+st.markdown(CSS_THEMES[data["settings"]["theme"]], unsafe_allow_html=True)
 
 
 # -----------------------
 # Helper Functions
 # -----------------------
+@functools.lru_cache(maxsize=4)
+def get_day_end_epoch(date):
+    """Epoch of the last microsecond of the given India date"""
+    next_day = datetime.combine(date + timedelta(days=1), datetime.min.time(), tzinfo=INDIA_TZ)
+    return next_day.timestamp() - 1e-6
+
+
+@functools.lru_cache(maxsize=4)
+def get_month_end_epoch(year, month):
+    """Epoch of the last microsecond of the given India month"""
+    if month == 12:
+        next_month = datetime(year + 1, 1, 1, tzinfo=INDIA_TZ)
+    else:
+        next_month = datetime(year, month + 1, 1, tzinfo=INDIA_TZ)
+    return next_month.timestamp() - 1e-6
+
+
 def get_remaining_today():
     """Get remaining time in current day (India timezone)"""
     now = get_india_now()
-    end = now.replace(hour=23, minute=59, second=59, microsecond=999999)
-    seconds = int((end - now).total_seconds())
+    seconds = int(get_day_end_epoch(now.date()) - now.timestamp())
     return max(0, seconds)
 
 
 def get_remaining_month():
     """Get remaining time in current month (India timezone)"""
     now = get_india_now()
-    if now.month == 12:
-        next_month = now.replace(year=now.year + 1, month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-    else:
-        next_month = now.replace(month=now.month + 1, day=1, hour=0, minute=0, second=0, microsecond=0)
-
-    # Last second of current month
-    end = next_month - timedelta(microseconds=1)
-    seconds = int((end - now).total_seconds())
+    seconds = int(get_month_end_epoch(now.year, now.month) - now.timestamp())
     return max(0, seconds)
 
 
 def format_time(seconds):
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = int(seconds % 60)
+    hours, rem = divmod(int(seconds), 3600)
+    minutes, secs = divmod(rem, 60)
     return f"{hours}h {minutes}m {secs}s"
 
 
-def get_streak():
-    dates = sorted(data["daily_time"].keys())
+def format_session_time(start_time):
+    """Format an ISO start timestamp as a clock time in India timezone"""
+    try:
+        session_time = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
+        if session_time.tzinfo is None:
+            session_time = session_time.replace(tzinfo=INDIA_TZ)
+        else:
+            session_time = session_time.astimezone(INDIA_TZ)
+        return session_time.strftime('%I:%M %p IST')
+    except:
+        return "Unknown time"
+
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def format_recent_sessions(recent_sessions):
+    """Expander titles and detail lines for the Recent Sessions list, newest first"""
+    rendered = []
+    for session in reversed(recent_sessions):
+        # Sessions saved before formatted_time existed are parsed once here
+        formatted_time = session.get("formatted_time") or format_session_time(session["start_time"])
+        title = f"{session['category']} - {format_time(session['duration'])} ({session['date']} at {formatted_time})"
+        details = [
+            f"**Duration:** {format_time(session['duration'])}",
+            f"**Category:** {session['category']}",
+            f"**Note:** {session['note'] or 'No note'}",
+            f"**Pomodoro:** {'Yes' if session['pomodoro'] else 'No'}",
+        ]
+        rendered.append((title, details))
+    return rendered
+
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def build_category_pie(category_items):
+    return px.pie(
+        values=[total for _, total in category_items],
+        names=[category for category, _ in category_items],
+        title="Time Distribution by Category"
+    )
+
+
+@st.cache_data(ttl="10m", show_spinner=False)
+def build_daily_chart(dates, times, goal_hours):
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=dates, y=times, mode='lines+markers', name='Daily Time'))
+    fig.add_hline(y=goal_hours, line_dash="dash", line_color="red", annotation_text="Daily Goal")
+    fig.update_layout(title="Daily Time Tracking (India Timezone)", xaxis_title="Date", yaxis_title="Hours")
+    return fig
+
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def build_sessions_csv(_sessions, session_count):
+    """The log is append-only, so the row count identifies its contents"""
+    return pd.DataFrame(_sessions).to_csv(index=False)
+
+
+def get_daily_time_version(date_str):
+    """Past days never change, so the entry count plus today's total identifies daily_time"""
+    return len(data["daily_time"]), data["daily_time"].get(date_str, 0)
+
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def compute_streak(_daily_time, current_date, version):
+    dates = sorted(_daily_time.keys())
     if not dates:
         return 0
 
     streak = 0
-    current_date = get_india_now().date()
 
+    # "%Y-%m-%d" strings compare like dates, so match them without parsing
     for i in range(len(dates)):
-        date_obj = datetime.strptime(dates[-(i + 1)], "%Y-%m-%d").date()
-        if data["daily_time"][dates[-(i + 1)]] > 0:
-            if date_obj == current_date - timedelta(days=i):
-                streak += 1
-            else:
-                break
+        date_str = dates[-(i + 1)]
+        expected = (current_date - timedelta(days=i)).strftime("%Y-%m-%d")
+        if date_str == expected and _daily_time[date_str] > 0:
+            streak += 1
         else:
             break
     return streak
 
 
+def get_streak():
+    current_date = get_india_now().date()
+    version = get_daily_time_version(current_date.strftime("%Y-%m-%d"))
+    return compute_streak(data["daily_time"], current_date, version)
+
+
 def get_weekly_time():
     """Get total time for current week (Monday to Sunday, India timezone)"""
     now = get_india_now()
-    week_start = now - timedelta(days=now.weekday())
-    week_time = 0
+    date_str = now.strftime("%Y-%m-%d")
+
+    # Earlier days of the week can't change, so their sum is kept until the day rolls over
+    if st.session_state.get("week_anchor") != date_str:
+        week_start = now.date() - timedelta(days=now.weekday())
+        week_total = 0
+        for i in range(now.weekday()):
+            week_total += data["daily_time"].get((week_start + timedelta(days=i)).strftime("%Y-%m-%d"), 0)
+        st.session_state.week_total = week_total
+        st.session_state.week_anchor = date_str
+
+    return st.session_state.week_total + data["daily_time"].get(date_str, 0)
 
-    for i in range(7):
-        date_str = (week_start + timedelta(days=i)).strftime("%Y-%m-%d")
-        if date_str in data["daily_time"]:
-            week_time += data["daily_time"][date_str]
 
-    return week_time
+def get_live_elapsed():
+    """Seconds since the current work/break phase started, from a monotonic clock"""
+    if st.session_state.timer_running and st.session_state.start_wall is not None:
+        return time.monotonic() - st.session_state.start_wall
+    return 0.0
 
 
 # -----------------------
 # Session State
 # -----------------------
-if "start_time" not in st.session_state:
-    st.session_state.start_time = None
+if "start_wall" not in st.session_state:
+    st.session_state.start_wall = None
 if "timer_running" not in st.session_state:
     st.session_state.timer_running = False
-if "live_elapsed" not in st.session_state:
-    st.session_state.live_elapsed = 0.0
 if "current_category" not in st.session_state:
     st.session_state.current_category = "Work"
 if "session_note" not in st.session_state:
@@ -213,7 +536,14 @@ if "is_break" not in st.session_state:
 # -----------------------
 # Sidebar
 # -----------------------
-with st.sidebar:
+# Widgets here rerun only the sidebar; settings that change the main page
+# trigger a full app rerun explicitly
+@st.fragment
+def show_sidebar():
+    # Sidebar interactions rerun only this fragment, so the module-level data may be
+    # from a much older app run; reload it so a save can't roll back time recorded since
+    data = load_data()
+
     st.title("🎯 Controls")
 
     # Theme selector
@@ -221,8 +551,8 @@ with st.sidebar:
                                 index=0 if data["settings"]["theme"] == "dark" else 1)
     if theme_option != data["settings"]["theme"]:
         data["settings"]["theme"] = theme_option
-        save_data(data)
-        st.rerun()
+        mark_dirty()
+        request_rerun()
 
     # Category selector
     st.session_state.current_category = st.selectbox("Category", data["categories"])
@@ -234,8 +564,10 @@ with st.sidebar:
 
     # Pomodoro settings
     st.subheader("🍅 Pomodoro")
-    st.session_state.pomodoro_mode = st.checkbox("Enable Pomodoro",
-                                                 value=st.session_state.pomodoro_mode)
+    pomodoro_mode = st.checkbox("Enable Pomodoro", value=st.session_state.pomodoro_mode)
+    if pomodoro_mode != st.session_state.pomodoro_mode:
+        st.session_state.pomodoro_mode = pomodoro_mode
+        request_rerun()  # the focus timer switches display mode
 
     if st.session_state.pomodoro_mode:
         work_min = st.slider("Work time (min)", 15, 60, data["settings"]["pomodoro"]["work"])
@@ -246,7 +578,8 @@ with st.sidebar:
             data["settings"]["pomodoro"]["break"] = break_min
             st.session_state.pomodoro_work_time = work_min * 60
             st.session_state.pomodoro_break_time = break_min * 60
-            save_data(data)
+            mark_dirty()
+            request_rerun()
 
     # Goals
     st.subheader("🎯 Goals")
@@ -256,120 +589,167 @@ with st.sidebar:
     if daily_goal != data["goals"]["daily"] // 3600 or weekly_goal != data["goals"]["weekly"] // 3600:
         data["goals"]["daily"] = daily_goal * 3600
         data["goals"]["weekly"] = weekly_goal * 3600
-        save_data(data)
+        mark_dirty()
+        request_rerun()  # refresh the progress bars
+
+    # Sidebar widgets rerun only this fragment, so its run ends here rather than at
+    # the bottom of the script
+    finish_run(data)
+
+
+with st.sidebar:
+    show_sidebar()
 
 # -----------------------
 # Main Content
 # -----------------------
-# Show current India time
-india_time = get_india_now()
-st.markdown(f"<div class='timezone-info'>🇮🇳 India Time: {india_time.strftime('%Y-%m-%d %I:%M:%S %p IST')}</div>",
-            unsafe_allow_html=True)
+# Timer regions re-render on their own every second while a session is running,
+# instead of re-executing the whole script
+refresh_interval = 1 if st.session_state.timer_running else None
+
+
+@st.fragment(run_every=refresh_interval)
+def show_header():
+    # Show current India time
+    india_time = get_india_now()
+    time_placeholder.markdown(
+        f"<div class='timezone-info'>🇮🇳 India Time: {india_time.strftime('%Y-%m-%d %I:%M:%S %p IST')}</div>",
+        unsafe_allow_html=True)
+
+    sec = get_remaining_month()
+    month_placeholder.markdown(f"<div class='big-timer'>{format_time(sec)}</div>", unsafe_allow_html=True)
+
+    sec = get_remaining_today()
+    today_placeholder.markdown(f"<div class='big-timer'>{format_time(sec)}</div>", unsafe_allow_html=True)
+
+    streak = get_streak()
+    streak_placeholder.markdown(f"<div class='streak-box'>🔥 {streak} Day Streak</div>", unsafe_allow_html=True)
+
+
+@st.fragment(run_every=refresh_interval)
+def show_focus_timer():
+    live_elapsed = get_live_elapsed()
+
+    # Pomodoro logic
+    if st.session_state.pomodoro_mode and st.session_state.timer_running:
+        if not st.session_state.is_break:
+            remaining = st.session_state.pomodoro_work_time - live_elapsed
+            if remaining <= 0:
+                st.session_state.is_break = True
+                st.session_state.start_wall = time.monotonic()
+                live_elapsed = 0.0
+                message_placeholder.success("Work session complete! Take a break!")
+        else:
+            remaining = st.session_state.pomodoro_break_time - live_elapsed
+            if remaining <= 0:
+                st.session_state.is_break = False
+                st.session_state.start_wall = time.monotonic()
+                live_elapsed = 0.0
+                message_placeholder.success("Break over! Ready for next work session!")
+
+    # Display timer
+    if st.session_state.pomodoro_mode:
+        if st.session_state.is_break:
+            remaining = st.session_state.pomodoro_break_time - live_elapsed
+            phase_placeholder.markdown(f"<div class='label'>☕ Break Time</div>", unsafe_allow_html=True)
+            focus_placeholder.markdown(f"<div class='big-timer'>{format_time(max(0, remaining))}</div>",
+                                       unsafe_allow_html=True)
+        else:
+            remaining = st.session_state.pomodoro_work_time - live_elapsed
+            phase_placeholder.markdown(f"<div class='label'>🍅 Work Time</div>", unsafe_allow_html=True)
+            focus_placeholder.markdown(f"<div class='big-timer'>{format_time(max(0, remaining))}</div>",
+                                       unsafe_allow_html=True)
+    else:
+        total_sec = int(data["daily_time"][today_str] + live_elapsed)
+        focus_placeholder.markdown(f"<div class='big-timer'>{format_time(total_sec)}</div>", unsafe_allow_html=True)
+
+    # Progress bars
+    daily_progress = (data["daily_time"][today_str] + live_elapsed) / data["goals"]["daily"]
+    daily_progress_placeholder.progress(min(daily_progress, 1.0))
+
+    weekly_progress = get_weekly_time() / data["goals"]["weekly"]
+    weekly_progress_placeholder.progress(min(weekly_progress, 1.0))
+
+
+# The static layout is drawn once per app run; the fragments above only refill its placeholders
+time_placeholder = st.empty()
 
 # Header with streak
 col1, col2, col3 = st.columns(3)
 
 with col1:
     st.markdown("<div class='label'>📅 Time Remaining This Month</div>", unsafe_allow_html=True)
-    sec = get_remaining_month()
-    st.markdown(f"<div class='big-timer'>{format_time(sec)}</div>", unsafe_allow_html=True)
+    month_placeholder = st.empty()
 
 with col2:
     st.markdown("<div class='label'>📆 Time Remaining Today</div>", unsafe_allow_html=True)
-    sec = get_remaining_today()
-    st.markdown(f"<div class='big-timer'>{format_time(sec)}</div>", unsafe_allow_html=True)
+    today_placeholder = st.empty()
 
 with col3:
-    streak = get_streak()
-    st.markdown(f"<div class='streak-box'>🔥 {streak} Day Streak</div>", unsafe_allow_html=True)
+    streak_placeholder = st.empty()
+
+show_header()
 
 # -----------------------
 # Focus Timer + Controls
 # -----------------------
 st.markdown("<div class='label'>🎯 Focus Session Timer</div>", unsafe_allow_html=True)
-
-# If running, update live_elapsed
-if st.session_state.timer_running:
-    now = time.time()
-    st.session_state.live_elapsed += now - (st.session_state.start_time or now)
-    st.session_state.start_time = now
-
-# Pomodoro logic
-if st.session_state.pomodoro_mode and st.session_state.timer_running:
-    if not st.session_state.is_break:
-        remaining = st.session_state.pomodoro_work_time - st.session_state.live_elapsed
-        if remaining <= 0:
-            st.session_state.is_break = True
-            st.session_state.live_elapsed = 0
-            st.session_state.start_time = time.time()
-            st.success("Work session complete! Take a break!")
-    else:
-        remaining = st.session_state.pomodoro_break_time - st.session_state.live_elapsed
-        if remaining <= 0:
-            st.session_state.is_break = False
-            st.session_state.live_elapsed = 0
-            st.session_state.start_time = time.time()
-            st.success("Break over! Ready for next work session!")
-
-# Display timer
-if st.session_state.pomodoro_mode:
-    if st.session_state.is_break:
-        remaining = st.session_state.pomodoro_break_time - st.session_state.live_elapsed
-        st.markdown(f"<div class='label'>☕ Break Time</div>", unsafe_allow_html=True)
-        st.markdown(f"<div class='big-timer'>{format_time(max(0, remaining))}</div>", unsafe_allow_html=True)
-    else:
-        remaining = st.session_state.pomodoro_work_time - st.session_state.live_elapsed
-        st.markdown(f"<div class='label'>🍅 Work Time</div>", unsafe_allow_html=True)
-        st.markdown(f"<div class='big-timer'>{format_time(max(0, remaining))}</div>", unsafe_allow_html=True)
-else:
-    total_sec = int(data["daily_time"][today_str] + st.session_state.live_elapsed)
-    st.markdown(f"<div class='big-timer'>{format_time(total_sec)}</div>", unsafe_allow_html=True)
+message_placeholder = st.empty()
+phase_placeholder = st.empty()
+focus_placeholder = st.empty()
 
 # Progress bars
 col1, col2 = st.columns(2)
 with col1:
-    daily_progress = (data["daily_time"][today_str] + st.session_state.live_elapsed) / data["goals"]["daily"]
-    st.progress(min(daily_progress, 1.0))
+    daily_progress_placeholder = st.empty()
     st.caption(f"Daily Goal: {format_time(data['goals']['daily'])}")
 
 with col2:
-    weekly_progress = get_weekly_time() / data["goals"]["weekly"]
-    st.progress(min(weekly_progress, 1.0))
+    weekly_progress_placeholder = st.empty()
     st.caption(f"Weekly Goal: {format_time(data['goals']['weekly'])}")
 
+show_focus_timer()
+
 # Buttons
 colA, colB, colC = st.columns([2, 2, 2])
 with colB:
     colX, colY = st.columns(2)
 
-    if colX.button("▶️ Start"):
-        st.session_state.start_time = time.time()
+    if colX.button("▶️ Start", key="btn_start"):
+        st.session_state.start_wall = time.monotonic()
         st.session_state.timer_running = True
-        st.session_state.live_elapsed = 0
+        st.rerun()  # pick up the 1s fragment refresh
 
-    if colY.button("⏹ Stop"):
+    if colY.button("⏹ Stop", key="btn_stop"):
+        # Whole seconds only; that is all the UI ever shows
+        live_elapsed = int(get_live_elapsed())
         st.session_state.timer_running = False
-        if st.session_state.live_elapsed > 0:
+        if live_elapsed > 0:
             # Save session with India timezone
+            india_now = get_india_now()
             session = {
                 "date": today_str,
-                "start_time": get_india_now().isoformat(),
-                "duration": st.session_state.live_elapsed,
+                "start_time": india_now.isoformat(),
+                "formatted_time": india_now.strftime('%I:%M %p IST'),
+                "duration": live_elapsed,
                 "category": st.session_state.current_category,
                 "note": st.session_state.session_note,
                 "pomodoro": st.session_state.pomodoro_mode
             }
-            data["sessions"].append(session)
+            add_session_row(data["sessions"], session)
+            append_session(session)
+
+            category = session["category"]
+            data["category_totals"][category] = int(data["category_totals"].get(category, 0) + live_elapsed)
 
             # Update daily time
             if not st.session_state.is_break:  # Only count work time
-                data["daily_time"][today_str] += st.session_state.live_elapsed
-
-            save_data(data)
-            st.session_state.live_elapsed = 0.0
+                data["daily_time"][today_str] = int(data["daily_time"][today_str] + live_elapsed)
+            mark_dirty()
             st.session_state.session_note = ""
-        st.session_state.start_time = None
+        st.session_state.start_wall = None
         st.session_state.is_break = False
+        request_rerun()  # stop the fragment refresh
 
 # -----------------------
 # Analytics Tab
@@ -377,41 +757,19 @@ with colB:
 tabs = st.tabs(["📊 Analytics", "📈 Reports", "⚙️ Settings"])
 
 with tabs[0]:
-    if data["sessions"]:
+    if data["sessions"]["date"]:
         # Recent sessions
         st.subheader("Recent Sessions")
-        recent_sessions = data["sessions"][-10:]  # Last 10 sessions
-        for session in reversed(recent_sessions):
-            # Parse and format time in India timezone
-            try:
-                session_time = datetime.fromisoformat(session['start_time'].replace('Z', '+00:00'))
-                if session_time.tzinfo is None:
-                    session_time = INDIA_TZ.localize(session_time)
-                else:
-                    session_time = session_time.astimezone(INDIA_TZ)
-                formatted_time = session_time.strftime('%I:%M %p IST')
-            except:
-                formatted_time = "Unknown time"
-
-            with st.expander(
-                    f"{session['category']} - {format_time(session['duration'])} ({session['date']} at {formatted_time})"):
-                st.write(f"**Duration:** {format_time(session['duration'])}")
-                st.write(f"**Category:** {session['category']}")
-                st.write(f"**Note:** {session['note'] or 'No note'}")
-                st.write(f"**Pomodoro:** {'Yes' if session['pomodoro'] else 'No'}")
+        recent_sessions = get_recent_sessions(data["sessions"])  # Last 10 sessions
+        for title, details in format_recent_sessions(recent_sessions):
+            with st.expander(title):
+                for line in details:
+                    st.write(line)
 
         # Category breakdown
         st.subheader("Time by Category")
-        category_time = defaultdict(float)
-        for session in data["sessions"]:
-            category_time[session["category"]] += session["duration"]
-
-        if category_time:
-            fig = px.pie(
-                values=list(category_time.values()),
-                names=list(category_time.keys()),
-                title="Time Distribution by Category"
-            )
+        if data["category_totals"]:
+            fig = build_category_pie(tuple(data["category_totals"].items()))
             st.plotly_chart(fig, use_container_width=True)
 
     else:
@@ -421,19 +779,15 @@ with tabs[1]:
     if data["daily_time"]:
         # Daily time chart
         st.subheader("Daily Time Report")
-        dates = sorted(data["daily_time"].keys())[-30:]  # Last 30 days
+        dates = sorted(heapq.nlargest(30, data["daily_time"]))  # Last 30 days
         times = [data["daily_time"][date] / 3600 for date in dates]  # Convert to hours
 
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=dates, y=times, mode='lines+markers', name='Daily Time'))
-        fig.add_hline(y=data["goals"]["daily"] / 3600, line_dash="dash", line_color="red", annotation_text="Daily Goal")
-        fig.update_layout(title="Daily Time Tracking (India Timezone)", xaxis_title="Date", yaxis_title="Hours")
+        fig = build_daily_chart(tuple(dates), tuple(times), data["goals"]["daily"] / 3600)
         st.plotly_chart(fig, use_container_width=True)
 
         # Export data
         if st.button("📥 Export Data"):
-            df = pd.DataFrame(data["sessions"])
-            csv = df.to_csv(index=False)
+            csv = build_sessions_csv(data["sessions"], len(data["sessions"]["date"]))
             st.download_button(
                 label="Download CSV",
                 data=csv,
@@ -449,8 +803,8 @@ with tabs[2]:
     if st.button("Add Category") and new_category:
         if new_category not in data["categories"]:
             data["categories"].append(new_category)
-            save_data(data)
-            st.rerun()
+            mark_dirty()
+            request_rerun()
 
     st.write("Current categories:")
     for i, category in enumerate(data["categories"]):
@@ -458,34 +812,19 @@ with tabs[2]:
         col1.write(category)
         if col2.button("Remove", key=f"remove_{i}") and len(data["categories"]) > 1:
             data["categories"].remove(category)
-            save_data(data)
-            st.rerun()
+            mark_dirty()
+            request_rerun()
+            break
 
 # Keyboard shortcuts info
 st.markdown("---")
 st.markdown("**Keyboard Shortcuts:** Press Space to Start/Stop timer")
 st.markdown("**Timezone:** All times are in India Standard Time (IST)")
 
-# Auto-refresh
-if st.session_state.timer_running:
-    time.sleep(1)
-    st.rerun()
+# Handle keyboard shortcuts with JavaScript. Scripts in st.markdown never execute, so the
+# handler runs from a zero-height component and attaches to the parent page once per render
+components.html(KEYBOARD_SHORTCUT_JS.replace("__RUNNING__", "true" if st.session_state.timer_running else "false"),
+                height=0)
 
-# Handle keyboard shortcuts with JavaScript
-st.markdown("""
-<script>
-document.addEventListener('keydown', function(e) {
-    if (e.code === 'Space' && !e.target.matches('input, textarea')) {
-        e.preventDefault();
-        // Find start/stop buttons and click them
-        const buttons = document.querySelectorAll('button');
-        for (let button of buttons) {
-            if (button.textContent.includes('▶️ Start') || button.textContent.includes('⏹ Stop')) {
-                button.click();
-                break;
-            }
-        }
-    }
-});
-</script>
-""", unsafe_allow_html=True)
\ No newline at end of file
+# Write any state changes deferred during this run, then apply a requested rerun
+finish_run(data)
@@ -0,0 +1,65 @@
+"""Themed stylesheets for the time tracker"""
+
+
+def _theme_css(bg_color, text_color, accent_color, button_color):
+    return f"""
+    <style>
+    html, body, [class*="css"] {{
+        background-color: {bg_color};
+        color: {text_color};
+        font-family: 'Courier New', monospace;
+    }}
+    .big-timer {{
+        font-size: 50px !important;
+        font-weight: bold;
+        color: {accent_color};
+        text-align: center;
+    }}
+    .label {{
+        font-size: 22px !important;
+        color: {accent_color};
+        text-align: center;
+        padding-top: 10px;
+        padding-bottom: 4px;
+    }}
+    .section {{
+        padding: 20px 0;
+    }}
+    .stButton>button {{
+        border-radius: 10px;
+        padding: 0.75em 1.5em;
+        font-size: 16px;
+        font-weight: bold;
+        color: {bg_color};
+        background-color: {button_color};
+        border: none;
+        transition: all 0.3s ease-in-out;
+    }}
+    .stButton>button:hover {{
+        background-color: {accent_color};
+        transform: scale(1.05);
+    }}
+    .streak-box {{
+        background-color: {accent_color};
+        color: {bg_color};
+        padding: 10px;
+        border-radius: 10px;
+        text-align: center;
+        font-weight: bold;
+        margin: 10px 0;
+    }}
+    .timezone-info {{
+        text-align: center;
+        font-size: 14px;
+        color: {accent_color};
+        margin-bottom: 20px;
+    }}
+    </style>
+    """
+
+
+# Built once at import; Streamlit re-executes app.py on every rerun but not its imports
+CSS_THEMES = {
+    "dark": _theme_css(bg_color="#0F0F0F", text_color="#F5DEB3", accent_color="#FFD700", button_color="#FFD700"),
+    "light": _theme_css(bg_color="#FFFFFF", text_color="#333333", accent_color="#2E86AB", button_color="#2E86AB"),
+}